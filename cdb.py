@@ -1,10 +1,24 @@
-from typing import Dict, Any
+import os
+from typing import Dict, Any, List, Optional, Tuple
 import requests
-import numpy as np
+from requests.adapters import HTTPAdapter
+import pandas as pd
 from astropy.table import Table
-from time import sleep
-from random import random
-from functools import lru_cache
+from time import sleep, monotonic
+import random
+import threading
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+QueryResult = Tuple[List[str], List[List[Any]]]
+
+# msgspec decodes JSON in C, substantially faster than the stdlib json used by
+# response.json() for large query results.
+_json_decoder = msgspec.json.Decoder() if msgspec is not None else None
 
 
 class ConsDB:
@@ -16,17 +30,85 @@ class ConsDB:
         RSP access token.
     server : str, optional
         ConsDB server URL, by default "https://usdf-rsp.slac.stanford.edu"
+    cache_size : int, optional
+        Maximum number of query responses to keep in the cache.  By default
+        taken from the CONSDB_CACHE_SIZE environment variable, or 8 if unset.
+        Set to 0 to disable caching.
+    cache_ttl : float, optional
+        Lifetime of cached responses in seconds, by default 300
+    cache_max_bytes : int, optional
+        Responses with bodies larger than this are not cached, by default 1 MB
+    pool_size : int, optional
+        Maximum number of pooled connections to the server, by default 16.
+        Should be at least the number of threads querying concurrently.
+
+    Notes
+    -----
+    Successful responses are cached per instance, keyed on the query string.
+    The cache is bounded both in size (oldest entries are evicted first) and
+    in age, so long-running processes neither grow without bound nor serve
+    arbitrarily stale results.  Only small responses are admitted, so bulk
+    exposure queries don't pin large payloads in memory.
+
+    An instance may be shared between threads.  The response cache is locked,
+    and all threads share one HTTP session whose connection pool (urllib3's,
+    which is thread-safe) holds up to ``pool_size`` keep-alive connections,
+    so concurrent queries reuse connections rather than each handshaking.
     """
 
-    def __init__(self, token: str, server: str = "https://usdf-rsp.slac.stanford.edu") -> None:
+    def __init__(
+        self,
+        token: str,
+        server: str = "https://usdf-rsp.slac.stanford.edu",
+        cache_size: Optional[int] = None,
+        cache_ttl: float = 300.0,
+        cache_max_bytes: int = 1_000_000,
+        pool_size: int = 16,
+    ) -> None:
         self.server = server
         self.token = token
         self.auth = ("user", token)
         self.url = f"{self.server}/consdb/query"
 
-    @lru_cache()
-    def _query(self, query: str) -> Dict[str, Any]:
-        """Execute a cached query against ConsDB.
+        if cache_size is None:
+            cache_size = int(os.environ.get("CONSDB_CACHE_SIZE", "8"))
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.cache_max_bytes = cache_max_bytes
+        self._cache: Dict[str, Tuple[float, QueryResult]] = {}
+        self._cache_lock = threading.Lock()
+
+        # Reuse pooled keep-alive connections across queries.  Retries are
+        # handled in query, so the adapter itself doesn't retry.
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+
+    def _cache_get(self, query: str) -> Optional[QueryResult]:
+        """Return the cached response for query, or None if missing/expired."""
+        with self._cache_lock:
+            entry = self._cache.get(query)
+            if entry is None:
+                return None
+            expires, response_data = entry
+            if monotonic() >= expires:
+                self._cache.pop(query, None)
+                return None
+            return response_data
+
+    def _cache_put(self, query: str, response_data: QueryResult) -> None:
+        """Insert a response into the cache, evicting the oldest if full."""
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache.pop(query, None)
+            while len(self._cache) >= self.cache_size:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[query] = (monotonic() + self.cache_ttl, response_data)
+
+    def _query(self, query: str) -> QueryResult:
+        """Execute a query against ConsDB, caching the response if small.
 
         Parameters
         ----------
@@ -35,35 +117,92 @@ class ConsDB:
 
         Returns
         -------
-        Dict[str, Any]
-            JSON response from the ConsDB API containing query results
+        Tuple[List[str], List[List[Any]]]
+            Column names and row data from the ConsDB API response
         """
         params = {"query": query}
-        response = requests.post(
-            self.url, auth=self.auth, json=params, timeout=30
-        )
+        response = self.session.post(self.url, json=params, timeout=30)
         response.raise_for_status()
-        return response.json()
+        if _json_decoder is not None:
+            try:
+                response_data = _json_decoder.decode(response.content)
+            except msgspec.DecodeError as e:
+                # Match response.json(), whose decode errors are retriable
+                raise requests.RequestException(f"Invalid JSON in ConsDB response: {e}") from e
+        else:
+            response_data = response.json()
+        result = response_data["columns"], response_data["data"]
+        if len(response.content) <= self.cache_max_bytes:
+            self._cache_put(query, result)
+        return result
 
-    def query(self, query: str, n_retries: int = 3) -> Table:
+    def query(
+        self,
+        query: str,
+        n_retries: int = 3,
+        base_delay: float = 0.5,
+        cap: float = 30.0,
+    ) -> Table:
         """Query ConsDB with retry logic.
 
+        See `query_dataframe` for the retry behavior and parameters.
+
         Parameters
         ----------
         query : str
             SQL query to execute.
         n_retries : int, optional
             Number of retry attempts for the query, by default 3
+        base_delay : float, optional
+            Backoff scale in seconds, by default 0.5
+        cap : float, optional
+            Maximum backoff in seconds, by default 30.0
 
         Returns
         -------
         astropy.table.Table
             Table with results of query.
+        """
+        return Table.from_pandas(
+            self.query_dataframe(query, n_retries=n_retries, base_delay=base_delay, cap=cap)
+        )
+
+    def query_dataframe(
+        self,
+        query: str,
+        n_retries: int = 3,
+        base_delay: float = 0.5,
+        cap: float = 30.0,
+    ) -> pd.DataFrame:
+        """Query ConsDB with retry logic, returning a DataFrame.
+
+        Transient failures (connection errors, timeouts and HTTP 5xx responses)
+        are retried using truncated exponential backoff with full jitter, i.e.,
+        before retry ``n`` we sleep a uniform random time in
+        ``[0, min(cap, base_delay * 2**(n-1))]``.
+
+        Parameters
+        ----------
+        query : str
+            SQL query to execute.
+        n_retries : int, optional
+            Number of retry attempts for the query, by default 3
+        base_delay : float, optional
+            Backoff scale in seconds, by default 0.5
+        cap : float, optional
+            Maximum backoff in seconds, by default 30.0
+
+        Returns
+        -------
+        pandas.DataFrame
+            DataFrame with results of query.
 
         Raises
         ------
         ValueError
             If no data is returned from the query
+        requests.HTTPError
+            If the server responds with a non-retriable (4xx) error
         requests.RequestException
             If unable to retrieve data after the specified number of retries
         """
@@ -71,21 +210,24 @@ class ConsDB:
         while attempt < n_retries:
             attempt += 1
             try:
-                response_data = self._query(query)
-                columns = response_data["columns"]
-                data = response_data["data"]
+                response_data = self._cache_get(query)
+                if response_data is None:
+                    response_data = self._query(query)
+                columns, data = response_data
 
                 if not columns or not data:
                     raise ValueError(f"No data returned for query: {query}")
 
-                table = Table(names=columns, data=np.array(data))
-                return table
+                # Let pandas infer per-column dtypes from the rows in C rather
+                # than round-tripping through a 2-D object array.
+                return pd.DataFrame(data, columns=columns)
 
-            except (requests.RequestException, ValueError, KeyError) as e:
-                if attempt == n_retries:
+            except requests.RequestException as e:
+                # Client errors (4xx) won't go away by replaying the same query.
+                client_error = e.response is not None and e.response.status_code < 500
+                if client_error or attempt == n_retries:
                     raise
-                sleep(0.5 + random())
-                continue
+            sleep(random.uniform(0, min(cap, base_delay * (2 ** (attempt - 1)))))
 
         # This should never be reached due to the raise in the except block
         raise requests.RequestException(f"Failed to execute query after {n_retries} retries")
\ No newline at end of file
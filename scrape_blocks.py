@@ -10,13 +10,24 @@ and exports the block information to blocks.json for use in the RubinTV guide.
 import argparse
 import json
 import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+import numpy as np
+import pandas as pd
 from typing import List, Tuple, Optional
 import astropy.units as u
-from astropy.table import QTable
+from astropy.table import QTable, Table
 from astropy.time import Time
 from pathlib import Path
 from cdb import ConsDB
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # Set up logging
 logging.basicConfig(
@@ -29,6 +40,9 @@ def get_rsp_token(token_path: Optional[str] = None) -> str:
     """
     Read RSP token from file.
 
+    The token is cached per expanded path, so repeated calls don't touch the
+    filesystem. Restart the process to pick up a changed token file.
+
     Parameters
     ----------
     token_path : str, optional
@@ -47,22 +61,132 @@ def get_rsp_token(token_path: Optional[str] = None) -> str:
     if token_path is None:
         token_path = "~/.lsst/rsp_token"
 
-    tokenfile = Path(token_path).expanduser()
+    return _read_token(Path(token_path).expanduser())
+
+
+@lru_cache(maxsize=4)
+def _read_token(tokenfile: Path) -> str:
+    """Read and cache the token stored in tokenfile."""
     if not tokenfile.exists():
         raise FileNotFoundError(f"RSP token file not found at {tokenfile}. Please ensure the token file exists.")
 
-    with open(tokenfile, "r") as f:
-        return f.read().strip()
+    return tokenfile.read_text().strip()
+
+
+def _exposure_id_range(start_date: str, end_date: str) -> Tuple[int, int]:
+    """
+    Convert a YYYYMMDD date range into exposure_id bounds.
+
+    Parameters
+    ----------
+    start_date : str
+        Start date in YYYYMMDD format
+    end_date : str
+        End date in YYYYMMDD format
+
+    Returns
+    -------
+    Tuple[int, int]
+        Exclusive (start, end) exposure_id bounds
+
+    Raises
+    ------
+    ValueError
+        If date format is invalid
+    """
+    try:
+        return int(f"{start_date}00000"), int(f"{end_date}00000")
+    except ValueError:
+        raise ValueError(f"Invalid date format. Expected YYYYMMDD, got start_date='{start_date}', end_date='{end_date}'")
+
+
+def _parse_timestamps(values) -> Time:
+    """
+    Convert ISO timestamp strings from ConsDB into a Time array.
+
+    Parsing via numpy datetime64 with an explicit format avoids astropy's
+    per-element format autodetection.
+
+    Parameters
+    ----------
+    values : array-like
+        ISO 8601 timestamp strings or datetime64 values
+
+    Returns
+    -------
+    Time
+        UTC times
+    """
+    return Time(np.asarray(values, dtype="datetime64[us]"), format="datetime64", scale="utc")
+
+
+def _make_blocks_table(programs, seq0, seq1, begin: Time, end: Time) -> QTable:
+    """
+    Assemble per-block arrays into a blocks table.
+
+    Parameters
+    ----------
+    programs : array-like
+        Science program of each block
+    seq0, seq1 : array-like
+        First and last seq_num of each block
+    begin, end : Time
+        Start of the first and end of the last exposure of each block
+
+    Returns
+    -------
+    QTable
+        Table of blocks with columns program, seq_num_0, seq_num_1, begin, end
+    """
+    return QTable({
+        "program": programs,
+        "seq_num_0": seq0,
+        "seq_num_1": seq1,
+        "begin": begin,
+        "end": end,
+    })
+
+
+def _month_ranges(start_date: str, end_date: str) -> List[Tuple[str, str]]:
+    """
+    Split a YYYYMMDD date range into consecutive calendar-month chunks.
+
+    Parameters
+    ----------
+    start_date : str
+        Start date in YYYYMMDD format
+    end_date : str
+        End date in YYYYMMDD format (exclusive)
+
+    Returns
+    -------
+    List[Tuple[str, str]]
+        Ordered (start, end) YYYYMMDD pairs covering the range, end exclusive
+    """
+    start = datetime.strptime(start_date, "%Y%m%d").date()
+    end = datetime.strptime(end_date, "%Y%m%d").date()
+
+    ranges = []
+    while start < end:
+        next_month = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        chunk_end = min(next_month, end)
+        ranges.append((start.strftime("%Y%m%d"), chunk_end.strftime("%Y%m%d")))
+        start = chunk_end
+    return ranges
 
 
 def query_exposure_records(
     token: str,
     start_date: str = "20250401",
-    end_date: str = "20280101"
+    end_date: str = "20280101",
+    max_workers: int = 8
 ) -> QTable:
     """
     Query exposure records from ConsDB.
 
+    The date range is fetched in monthly chunks, concurrently, which bounds
+    the size of each response.
+
     Parameters
     ----------
     token : str
@@ -71,6 +195,8 @@ def query_exposure_records(
         Start date in YYYYMMDD format, by default "20250401"
     end_date : str, optional
         End date in YYYYMMDD format (exclusive), by default "20280101"
+    max_workers : int, optional
+        Maximum number of concurrent chunk queries, by default 8
 
     Returns
     -------
@@ -80,43 +206,183 @@ def query_exposure_records(
     Raises
     ------
     ValueError
-        If date format is invalid
+        If date format is invalid or no exposures are found
     """
-    # Validate date format
-    try:
-        start_exposure_id = int(f"{start_date}00000")
-        end_exposure_id = int(f"{end_date}00000")
-    except ValueError:
-        raise ValueError(f"Invalid date format. Expected YYYYMMDD, got start_date='{start_date}', end_date='{end_date}'")
+    _exposure_id_range(start_date, end_date)
 
     logging.info(f"Querying exposure records from {start_date} to {end_date}")
 
+    # One connection per worker, shared through the client's session pool
+    cdb = ConsDB(token, pool_size=max_workers)
+
+    def query_chunk(date_range: Tuple[str, str]) -> Optional[pd.DataFrame]:
+        chunk_start_id, chunk_end_id = _exposure_id_range(*date_range)
+        query = (
+            "SELECT exposure_id, seq_num, science_program, obs_start, obs_end "
+            "FROM cdb_lsstcam.exposure "
+            f"WHERE exposure_id > {chunk_start_id} AND exposure_id < {chunk_end_id} "
+            "ORDER BY exposure_id ASC"
+        )
+        try:
+            return cdb.query_dataframe(query)
+        except ValueError:
+            logging.debug(f"No exposure records from {date_range[0]} to {date_range[1]}")
+            return None
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # map preserves chunk order, so the result stays sorted
+            chunks = [chunk for chunk in executor.map(query_chunk, _month_ranges(start_date, end_date))
+                      if chunk is not None]
+        if not chunks:
+            raise ValueError(f"No exposure records found from {start_date} to {end_date}")
+        # Concatenate before converting so every chunk ends up with the same
+        # column dtype, even if a column is entirely NULL within one month.
+        records = QTable(Table.from_pandas(pd.concat(chunks, ignore_index=True)))
+        logging.info(f"Retrieved {len(records)} exposure records")
+    except Exception as e:
+        logging.error(f"Failed to query exposure records: {e}")
+        raise
+
+    starts = np.asarray(records["obs_start"], dtype="datetime64[us]")
+    ends = np.asarray(records["obs_end"], dtype="datetime64[us]")
+    records["begin"] = _parse_timestamps(starts)
+    records["end"] = _parse_timestamps(ends)
+
+    # Compute gaps from the raw timestamps rather than via Time/TimeDelta
+    delay = np.zeros(len(records))
+    delay[1:] = (starts[1:] - ends[:-1]) / np.timedelta64(1, "s")
+    records["delay"] = (delay * u.s).to(u.min)
+
+    return records
+
+
+def query_blocks(
+    token: str,
+    start_date: str = "20250401",
+    end_date: str = "20280101",
+    max_gap: u.Quantity = 15*u.min
+) -> QTable:
+    """
+    Query observation blocks from ConsDB, grouping exposures server-side.
+
+    Uses window functions to flag the first and last exposure of each block
+    in the database, so only block boundary rows are transferred instead of
+    every exposure in the date range.  Blocks are split using the same
+    criteria as `group_into_blocks`.
+
+    Parameters
+    ----------
+    token : str
+        RSP access token
+    start_date : str, optional
+        Start date in YYYYMMDD format, by default "20250401"
+    end_date : str, optional
+        End date in YYYYMMDD format (exclusive), by default "20280101"
+    max_gap : u.Quantity, optional
+        Maximum time gap between exposures in same block, by default 15*u.min
+
+    Returns
+    -------
+    QTable
+        Table of blocks with columns program, seq_num_0, seq_num_1, begin, end
+
+    Raises
+    ------
+    ValueError
+        If date format is invalid
+    """
+    start_exposure_id, end_exposure_id = _exposure_id_range(start_date, end_date)
+
+    logging.info(f"Querying observation blocks from {start_date} to {end_date} with max gap of {max_gap}")
+
     cdb = ConsDB(token)
+    gap_seconds = max_gap.to_value(u.s)
     query = (
-        "SELECT exposure_id, day_obs, seq_num, science_program, observation_reason, obs_start, obs_end "
+        "WITH e AS ("
+        "SELECT exposure_id, seq_num, science_program, obs_start, obs_end, "
+        "LAG(exposure_id) OVER w AS prev_id, "
+        "LEAD(exposure_id) OVER w AS next_id, "
+        "LAG(science_program) OVER w AS prev_prog, "
+        "LEAD(science_program) OVER w AS next_prog, "
+        "EXTRACT(EPOCH FROM obs_start - LAG(obs_end) OVER w) AS gap_before, "
+        "EXTRACT(EPOCH FROM LEAD(obs_start) OVER w - obs_end) AS gap_after "
         "FROM cdb_lsstcam.exposure "
         f"WHERE exposure_id > {start_exposure_id} AND exposure_id < {end_exposure_id} "
+        "WINDOW w AS (ORDER BY exposure_id)"
+        "), b AS ("
+        "SELECT exposure_id, seq_num, science_program, obs_start, obs_end, "
+        "CAST((prev_id IS NULL OR prev_prog IS DISTINCT FROM science_program "
+        f"OR COALESCE(gap_before >= {gap_seconds}, FALSE)) AS INTEGER) AS is_begin, "
+        "CAST((next_id IS NULL OR next_prog IS DISTINCT FROM science_program "
+        f"OR COALESCE(gap_after >= {gap_seconds}, FALSE)) AS INTEGER) AS is_end "
+        "FROM e"
+        ") "
+        "SELECT * FROM b WHERE is_begin = 1 OR is_end = 1 "
         "ORDER BY exposure_id ASC"
     )
 
     try:
         records = QTable(cdb.query(query))
-        logging.info(f"Retrieved {len(records)} exposure records")
+        logging.info(f"Retrieved {len(records)} block boundary records")
     except Exception as e:
-        logging.error(f"Failed to query exposure records: {e}")
+        logging.error(f"Failed to query observation blocks: {e}")
         raise
 
-    records["begin"] = Time(records["obs_start"])
-    records["end"] = Time(records["obs_end"])
-    records["begin"].format = "jd"
-    records["end"].format = "jd"
-    records["delay"] = 0.0 * u.min
-    records["delay"][1:] = records["begin"][1:] - records["end"][:-1]
+    # A single-exposure block is flagged as both its begin and its end, so
+    # pairing the flagged rows in order recovers the blocks.
+    for flag in ("is_begin", "is_end"):
+        if np.any(getattr(records[flag], "mask", False)):
+            raise ValueError(f"ConsDB returned NULL {flag} flags")
+    begin_idx = np.flatnonzero(np.asarray(records["is_begin"], dtype=bool))
+    end_idx = np.flatnonzero(np.asarray(records["is_end"], dtype=bool))
+    if len(begin_idx) != len(end_idx):
+        raise ValueError(
+            f"Mismatched block boundaries: {len(begin_idx)} begins, {len(end_idx)} ends"
+        )
 
-    return records
+    programs = np.asarray(records["science_program"])
+    seq = np.asarray(records["seq_num"])
+    blocks = _make_blocks_table(
+        programs[end_idx],
+        seq[begin_idx],
+        seq[end_idx],
+        _parse_timestamps(records["obs_start"][begin_idx]),
+        _parse_timestamps(records["obs_end"][end_idx]),
+    )
+
+    logging.info(f"Created {len(blocks)} observation blocks")
+    return blocks
+
+
+def _find_block_edges(programs: np.ndarray, delay_min: np.ndarray, max_gap: float) -> np.ndarray:
+    """
+    Find the row indices delimiting observation blocks.
+
+    A new block starts whenever the program changes or the gap since the
+    previous exposure reaches max_gap.
+
+    Parameters
+    ----------
+    programs : np.ndarray
+        Program of each exposure
+    delay_min : np.ndarray
+        Gap before each exposure in minutes
+    max_gap : float
+        Maximum gap in minutes between exposures in same block
+
+    Returns
+    -------
+    np.ndarray
+        Block edges; block i spans rows edges[i] to edges[i+1] - 1
+    """
+    prog_change = programs[1:] != programs[:-1]
+    gap_exceeded = delay_min[1:] >= max_gap
+    breaks = np.flatnonzero(prog_change | gap_exceeded) + 1
+    return np.concatenate([[0], breaks, [len(programs)]]).astype(np.int64)
 
 
-def group_into_blocks(table: QTable, max_gap: u.Quantity = 15*u.min) -> List[Tuple[str, int, int, Time, Time]]:
+def group_into_blocks(table: QTable, max_gap: u.Quantity = 15*u.min) -> QTable:
     """
     Group exposures into observation blocks.
 
@@ -129,8 +395,8 @@ def group_into_blocks(table: QTable, max_gap: u.Quantity = 15*u.min) -> List[Tup
 
     Returns
     -------
-    List[Tuple[str, int, int, Time, Time]]
-        List of block tuples containing (program, seq0, seq1, begin, end)
+    QTable
+        Table of blocks with columns program, seq_num_0, seq_num_1, begin, end
 
     Raises
     ------
@@ -139,7 +405,9 @@ def group_into_blocks(table: QTable, max_gap: u.Quantity = 15*u.min) -> List[Tup
     """
     if len(table) == 0:
         logging.warning("Empty table provided to group_into_blocks")
-        return []
+        no_times = _parse_timestamps(np.array([], dtype="datetime64[us]"))
+        return _make_blocks_table(np.array([], dtype=str), np.array([], dtype=int),
+                                  np.array([], dtype=int), no_times, no_times)
 
     required_columns = ["science_program", "seq_num", "begin", "end", "delay"]
     missing_columns = [col for col in required_columns if col not in table.colnames]
@@ -148,58 +416,41 @@ def group_into_blocks(table: QTable, max_gap: u.Quantity = 15*u.min) -> List[Tup
 
     logging.info(f"Grouping {len(table)} exposures into blocks with max gap of {max_gap}")
 
-    blocks = []
-    table["block"] = -999
-    block_id = 0
-
-    begin_row = table[0]
-
-    for i, row in enumerate(table):
-        if i == 0:
-            continue
-
-        previous_row = table[i-1]
-
-        # Check if we should continue the current block
-        same_program = row["science_program"] == previous_row["science_program"]
-        gap_ok = row["delay"] < max_gap
-        not_last = i != len(table) - 1
-
-        if same_program and gap_ok and not_last:
-            continue
-
-        # End of block reached
-        end_row = row if i == len(table) - 1 else previous_row
-
-        # Create block tuple (only include data that's actually used in export)
-        block_data = (
-            end_row["science_program"],
-            begin_row["seq_num"],
-            end_row["seq_num"],
-            begin_row["begin"],
-            end_row["end"]
-        )
-        blocks.append(block_data)
-
-        # Mark rows belonging to this block
-        table["block"][begin_row.index:end_row.index+1] = block_id
+    # Bind columns once; indexing the table repeatedly dispatches through
+    # the Table machinery each time.
+    programs = np.asarray(table["science_program"])
+    seq = np.asarray(table["seq_num"])
+    begins = table["begin"]
+    ends = table["end"]
+    delays = table["delay"].to_value(u.min)
+
+    edges = _find_block_edges(programs, delays, max_gap.to_value(u.min))
+
+    begin_idx = edges[:-1]
+    end_idx = edges[1:] - 1
+    blocks = _make_blocks_table(
+        programs[end_idx],
+        seq[begin_idx],
+        seq[end_idx],
+        begins[begin_idx],
+        ends[end_idx],
+    )
 
-        # Start new block
-        begin_row = row
-        block_id += 1
+    # Mark rows belonging to each block
+    table["block"] = np.repeat(np.arange(len(blocks), dtype=np.int32), np.diff(edges))
 
     logging.info(f"Created {len(blocks)} observation blocks")
     return blocks
 
 
-def export_blocks_to_json(blocks: List[Tuple[str, int, int, Time, Time]], filename: str = "blocks.json") -> None:
+def export_blocks_to_json(blocks: QTable, filename: str = "blocks.json") -> None:
     """
     Export blocks to JSON format.
 
     Parameters
     ----------
-    blocks : List[Tuple[str, int, int, Time, Time]]
-        List of block tuples containing (program, seq0, seq1, begin, end)
+    blocks : QTable
+        Table of blocks with columns program, seq_num_0, seq_num_1, begin, end
     filename : str, optional
         Output filename, by default "blocks.json"
 
@@ -210,49 +461,57 @@ def export_blocks_to_json(blocks: List[Tuple[str, int, int, Time, Time]], filena
     """
     logging.info(f"Exporting {len(blocks)} blocks to {filename}")
 
+    # Format all times in one call each; per-scalar .isot is slow.
+    begins_iso = blocks["begin"].isot
+    ends_iso = blocks["end"].isot
+
     data = []
-    for program, seq0, seq1, begin, end in blocks:
+    for program, seq0, seq1, begin_iso, end_iso in zip(
+        blocks["program"], blocks["seq_num_0"], blocks["seq_num_1"], begins_iso, ends_iso
+    ):
         block_dict = {
             "program": program,
-            "begin": begin.isot + "Z",
-            "end": end.isot + "Z",
+            "begin": begin_iso + "Z",
+            "end": end_iso + "Z",
             "seq_num_0": int(seq0),
             "seq_num_1": int(seq1),
         }
         data.append(block_dict)
 
     try:
-        with open(filename, "w") as f:
-            json.dump(data, f, indent=2)
+        if orjson is not None:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+            Path(filename).write_bytes(payload)
+        else:
+            with open(filename, "w") as f:
+                json.dump(data, f, indent=2)
         logging.info(f"Successfully exported {len(data)} blocks to {filename}")
     except IOError as e:
         logging.error(f"Failed to write to {filename}: {e}")
         raise
 
 
-def print_block_statistics(blocks: List[Tuple[str, int, int, Time, Time]]) -> None:
+def print_block_statistics(blocks: QTable) -> None:
     """
     Print useful statistics about the blocks.
 
     Parameters
     ----------
-    blocks : List[Tuple[str, int, int, Time, Time]]
-        List of block tuples
+    blocks : QTable
+        Table of blocks
     """
-    if not blocks:
+    if len(blocks) == 0:
         logging.info("No blocks to analyze")
         return
 
-    programs = [block[0] for block in blocks]
-    unique_programs = set(programs)
+    counts = Counter(blocks["program"])
 
     logging.info(f"Block Statistics:")
     logging.info(f"  Total blocks: {len(blocks)}")
-    logging.info(f"  Unique programs: {len(unique_programs)}")
+    logging.info(f"  Unique programs: {len(counts)}")
 
-    for program in sorted(unique_programs):
-        count = programs.count(program)
-        logging.info(f"    {program}: {count} blocks")
+    for program in sorted(counts):
+        logging.info(f"    {program}: {counts[program]} blocks")
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -285,6 +544,11 @@ def parse_arguments() -> argparse.Namespace:
         "--token-path",
         help="Path to RSP token file (default: ~/.lsst/rsp_token)"
     )
+    parser.add_argument(
+        "--client-side",
+        action="store_true",
+        help="Fetch every exposure and group into blocks locally instead of in the ConsDB query"
+    )
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -306,16 +570,25 @@ def main() -> None:
         # Get token
         token = get_rsp_token(args.token_path)
 
-        # Query records
-        records = query_exposure_records(
-            token=token,
-            start_date=args.start_date,
-            end_date=args.end_date
-        )
-
-        # Group into blocks
         max_gap = args.max_gap * u.min
-        blocks = group_into_blocks(records, max_gap=max_gap)
+        if args.client_side:
+            # Query records
+            records = query_exposure_records(
+                token=token,
+                start_date=args.start_date,
+                end_date=args.end_date
+            )
+
+            # Group into blocks
+            blocks = group_into_blocks(records, max_gap=max_gap)
+        else:
+            # Query blocks directly
+            blocks = query_blocks(
+                token=token,
+                start_date=args.start_date,
+                end_date=args.end_date,
+                max_gap=max_gap
+            )
 
         # Print statistics
         print_block_statistics(blocks)